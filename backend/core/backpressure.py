@@ -44,13 +44,14 @@ from starlette.responses import JSONResponse
 try:
     from backend.core.metrics import ApiMetrics
     from backend.core.redis_client import RedisClient, RedisDb
-    from backend.core.telemetry import add_span_attribute, get_current_span
+    from backend.core.telemetry import add_span_attributes
     from backend.providers import get_providers_by_category
 except ImportError:
     # Fallback for development/testing
     ApiMetrics = None
     RedisClient = None
     get_providers_by_category = lambda x: []
+    add_span_attributes = lambda attributes: None
 
 # Configure logging
 logger = logging.getLogger(__name__)
@@ -446,10 +447,10 @@ class BackpressureMiddleware(BaseHTTPMiddleware):
             return await call_next(request)
         
         # Add tracing attributes
-        span = get_current_span()
-        if span:
-            add_span_attribute("backpressure.provider", provider_id)
-            add_span_attribute("backpressure.enabled", self.manager.enabled)
+        add_span_attributes({
+            "backpressure.provider": provider_id,
+            "backpressure.enabled": self.manager.enabled,
+        })
         
         # Check if request is allowed
         allowed, reason = await self.manager.check_request_allowed(provider_id, request_cost_usd=0.001)
@@ -457,9 +458,10 @@ class BackpressureMiddleware(BaseHTTPMiddleware):
         if not allowed:
             logger.warning(f"Request blocked for {provider_id}: {reason}")
             
-            if span:
-                add_span_attribute("backpressure.blocked", True)
-                add_span_attribute("backpressure.reason", reason)
+            add_span_attributes({
+                "backpressure.blocked": True,
+                "backpressure.reason": reason,
+            })
             
             return JSONResponse(
                 status_code=status.HTTP_429_TOO_MANY_REQUESTS,
@@ -484,9 +486,10 @@ class BackpressureMiddleware(BaseHTTPMiddleware):
                 success=success
             )
             
-            if span:
-                add_span_attribute("backpressure.recorded", True)
-                add_span_attribute("backpressure.success", success)
+            add_span_attributes({
+                "backpressure.recorded": True,
+                "backpressure.success": success,
+            })
             
             return response
             
@@ -498,10 +501,11 @@ class BackpressureMiddleware(BaseHTTPMiddleware):
                 success=False
             )
             
-            if span:
-                add_span_attribute("backpressure.recorded", True)
-                add_span_attribute("backpressure.success", False)
-                add_span_attribute("backpressure.error", str(e))
+            add_span_attributes({
+                "backpressure.recorded": True,
+                "backpressure.success": False,
+                "backpressure.error": str(e),
+            })
             
             raise
     
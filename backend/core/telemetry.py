@@ -14,7 +14,7 @@ Features:
 Usage:
     from backend.core.telemetry import init_telemetry, tracer
     
-    # Initialize in main.py
+    # Initialized on import when OTEL_TRACE_ENABLED=true, or explicitly
     init_telemetry()
     
     # Use in code
@@ -25,105 +25,280 @@ Usage:
 Generated by Factory Droid on 2025-06-28 following "cook & push to GitHub" motto
 """
 
+import inspect
 import logging
 import os
+import queue
+import re
+import sys
+import threading
+import time
+from collections import OrderedDict
 from contextlib import contextmanager
-from functools import wraps
-from typing import Any, Callable, Dict, Optional, Union
+from contextvars import ContextVar
+from functools import lru_cache, wraps
+from itertools import cycle
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Dict,
+    Final,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Union,
+)
 
 from opentelemetry import trace
-from opentelemetry.exporter.otlp.proto.grpc.trace_exporter import OTLPSpanExporter
-from opentelemetry.instrumentation.httpx import HTTPXClientInstrumentor
-from opentelemetry.instrumentation.logging import LoggingInstrumentor
-from opentelemetry.instrumentation.psycopg2 import Psycopg2Instrumentor
-from opentelemetry.instrumentation.redis import RedisInstrumentor
-from opentelemetry.instrumentation.requests import RequestsInstrumentor
-from opentelemetry.propagate import set_global_textmap
-from opentelemetry.propagators.b3 import B3MultiFormat
+from opentelemetry.attributes import BoundedAttributes
+from opentelemetry.context import Context
 from opentelemetry.sdk.resources import Resource
-from opentelemetry.sdk.trace import TracerProvider
-from opentelemetry.sdk.trace.export import BatchSpanProcessor, ConsoleSpanExporter
-from opentelemetry.util.http import get_excluded_urls
+from opentelemetry.sdk.trace import ReadableSpan, SpanProcessor, TracerProvider
+from opentelemetry.sdk.trace.sampling import (
+    ALWAYS_ON,
+    Decision,
+    ParentBased,
+    Sampler,
+    SamplingResult,
+    TraceIdRatioBased,
+)
+from opentelemetry.trace import Link, SpanKind
+from opentelemetry.trace.span import TraceState
+from opentelemetry.util.types import Attributes
+
+# Exporters, instrumentors and propagators (grpcio, protobuf, patched client
+# libraries) are imported where they are used so that importing this module
+# stays cheap when tracing is disabled
+if TYPE_CHECKING:
+    from grpc import Compression
+    from opentelemetry.exporter.otlp.proto.grpc.trace_exporter import OTLPSpanExporter
+    from opentelemetry.sdk.trace.export import BatchSpanProcessor, SpanExporter
+    from requests import PreparedRequest
 
 # Configure module logger
 logger = logging.getLogger(__name__)
 
-# Global tracer instance
-tracer: Optional[trace.Tracer] = None
-
 # Service information
 SERVICE_NAME = "analyst-droid"
 SERVICE_VERSION = "1.9.0-beta"
 SERVICE_NAMESPACE = "blockchain-analysis"
 
-# Span names and attributes
+# Global tracer instance; a proxy producing non-recording spans until
+# init_telemetry installs the SDK provider
+tracer: trace.Tracer = trace.get_tracer(__name__, SERVICE_VERSION)
+
+# Default head-sampling ratio (overridable via OTEL_TRACE_SAMPLE_RATE)
+DEFAULT_SAMPLE_RATE = 0.05
+
+# BatchSpanProcessor defaults tuned for bursty agent workloads: a larger queue
+# absorbs bursts, smaller batches keep gRPC messages small, and a shorter delay
+# surfaces traces sooner. Keep max_queue_size at roughly 5x max_export_batch_size
+# when scaling either value.
+DEFAULT_BSP_CONFIG: Dict[str, int] = {
+    "max_queue_size": 4096,
+    "schedule_delay_millis": 1000,
+    "max_export_batch_size": 256,
+    "export_timeout_millis": 10000,
+}
+
+# Environment variables overriding each BatchSpanProcessor setting
+_BSP_ENV_VARS: Dict[str, str] = {
+    "max_queue_size": "OTEL_BSP_MAX_QUEUE_SIZE",
+    "schedule_delay_millis": "OTEL_BSP_SCHEDULE_DELAY",
+    "max_export_batch_size": "OTEL_BSP_MAX_EXPORT_BATCH_SIZE",
+    "export_timeout_millis": "OTEL_BSP_EXPORT_TIMEOUT",
+}
+
+# Wallet under analysis for the current request, read by trace_fraud_detection
+_WALLET_CTX: ContextVar[Optional[str]] = ContextVar("wallet", default=None)
+
+# Whether tracing is enabled; the module initializes itself on import when set
+TRACING_ENABLED = os.getenv("OTEL_TRACE_ENABLED", "false").lower() == "true"
+
+# Explicitly mark successful spans OK (UNSET already means success)
+RECORD_OK_STATUS = os.getenv("OTEL_RECORD_OK_STATUS", "false").lower() == "true"
+
+# Low-value, high-frequency endpoints skipped by HTTP instrumentation unless
+# OTEL_PYTHON_EXCLUDED_URLS overrides them. Patterns are regexes searched over
+# the full URL, so they are anchored to the path to avoid matching business
+# routes such as /api/v1/analysis/.../metrics/{wallet}
+DEFAULT_EXCLUDED_URLS = r"^https?://[^/]+(/api/v1)?/(health|metrics|ping)(/|\?|$)"
+
+# Extra exclusions passed to init_telemetry, reused by instrument_fastapi
+_extra_excluded_urls: Optional[str] = None
+
+# Whether init_telemetry enabled error-trace preservation
+_preserve_errors = False
+
+# Set once init_telemetry has completed successfully
+_initialized = False
+
+# External API hosts mapped to provider names for outgoing HTTP spans
+_PROVIDER_HOSTS: Dict[str, str] = {
+    "api.sim.dune.com": "sim",
+    "api.covalenthq.com": "covalent",
+    "deep-index.moralis.io": "moralis",
+    "generativelanguage.googleapis.com": "gemini",
+}
+
+# URL normalization for low-cardinality span attributes: query strings and
+# fragments are stripped, and path tokens longer than the limit are replaced
+MAX_URL_TOKEN_LENGTH = 128
+_SANITIZE_QUERY_RE = re.compile(r"[?#].*$")
+_LONG_TOKEN_RE = re.compile(rf"[^/]{{{MAX_URL_TOKEN_LENGTH + 1},}}")
+# Full-URL span attributes under the old and stable HTTP semantic conventions
+_HTTP_URL_ATTRIBUTES = ("http.url", "url.full")
+
+# Number of parallel OTLP export pipelines (overridable via
+# OTEL_BSP_MAX_CONCURRENT_EXPORTS); each has its own gRPC channel and export
+# thread, so raise it only when a single pipeline cannot keep up
+DEFAULT_CONCURRENT_EXPORTS = 1
+
+# Supported OTEL_EXPORTER_OTLP_COMPRESSION values
+_OTLP_COMPRESSION: Dict[str, str] = {
+    "gzip": "Gzip",
+    "deflate": "Deflate",
+    "none": "NoCompression",
+}
+
+# Span names and attributes, interned so attribute-key lookups in the SDK
+# compare by identity
+
+# External API calls
+SPAN_NAME_API_CALL: Final[str] = sys.intern("external_api_call")
+SPAN_NAME_SIM_API_CALL: Final[str] = sys.intern("sim_api_call")
+SPAN_NAME_COVALENT_API_CALL: Final[str] = sys.intern("covalent_api_call")
+SPAN_NAME_MORALIS_API_CALL: Final[str] = sys.intern("moralis_api_call")
+SPAN_NAME_GEMINI_API_CALL: Final[str] = sys.intern("gemini_api_call")
+
+# Database operations
+SPAN_NAME_NEO4J_QUERY: Final[str] = sys.intern("neo4j_query")
+SPAN_NAME_NEO4J_INGEST: Final[str] = sys.intern("neo4j_ingest")
+SPAN_NAME_POSTGRES_QUERY: Final[str] = sys.intern("postgres_query")
+SPAN_NAME_REDIS_OPERATION: Final[str] = sys.intern("redis_operation")
+
+# Agent workflows
+SPAN_NAME_CREW_EXECUTION: Final[str] = sys.intern("crew_execution")
+SPAN_NAME_AGENT_TASK: Final[str] = sys.intern("agent_task")
+SPAN_NAME_TOOL_EXECUTION: Final[str] = sys.intern("tool_execution")
+
+# Business logic
+SPAN_NAME_FRAUD_DETECTION: Final[str] = sys.intern("fraud_detection")
+SPAN_NAME_GRAPH_ANALYSIS: Final[str] = sys.intern("graph_analysis")
+SPAN_NAME_RAG_QUERY: Final[str] = sys.intern("rag_query")
+SPAN_NAME_EVIDENCE_PROCESSING: Final[str] = sys.intern("evidence_processing")
+
+# Service attributes
+ATTR_SERVICE_NAME: Final[str] = sys.intern("service.name")
+ATTR_SERVICE_VERSION: Final[str] = sys.intern("service.version")
+ATTR_SERVICE_NAMESPACE: Final[str] = sys.intern("service.namespace")
+
+# External API attributes
+ATTR_API_PROVIDER: Final[str] = sys.intern("api.provider")
+ATTR_API_ENDPOINT: Final[str] = sys.intern("api.endpoint")
+ATTR_API_METHOD: Final[str] = sys.intern("api.method")
+ATTR_API_STATUS_CODE: Final[str] = sys.intern("api.status_code")
+ATTR_API_COST_USD: Final[str] = sys.intern("api.cost_usd")
+ATTR_API_RATE_LIMITED: Final[str] = sys.intern("api.rate_limited")
+
+# Database attributes
+ATTR_DB_SYSTEM: Final[str] = sys.intern("db.system")
+ATTR_DB_NAME: Final[str] = sys.intern("db.name")
+ATTR_DB_OPERATION: Final[str] = sys.intern("db.operation")
+ATTR_DB_QUERY: Final[str] = sys.intern("db.statement")
+ATTR_DB_ROWS_AFFECTED: Final[str] = sys.intern("db.rows_affected")
+
+# Agent attributes
+ATTR_CREW_NAME: Final[str] = sys.intern("crew.name")
+ATTR_AGENT_NAME: Final[str] = sys.intern("agent.name")
+ATTR_TASK_TYPE: Final[str] = sys.intern("task.type")
+ATTR_TOOL_NAME: Final[str] = sys.intern("tool.name")
+
+# Business logic attributes
+ATTR_WALLET_ADDRESS: Final[str] = sys.intern("blockchain.wallet_address")
+ATTR_CHAIN_ID: Final[str] = sys.intern("blockchain.chain_id")
+ATTR_TOKEN_ADDRESS: Final[str] = sys.intern("blockchain.token_address")
+ATTR_FRAUD_SCORE: Final[str] = sys.intern("fraud.score")
+ATTR_FRAUD_TYPE: Final[str] = sys.intern("fraud.type")
+
+# Sampling attributes
+ATTR_SAMPLING_FORCE: Final[str] = sys.intern("sampling.force")
+
 class SpanNames:
-    """Standard span names for consistent tracing."""
+    """Standard span names for consistent tracing (aliases of SPAN_NAME_*)."""
     
     # External API calls
-    API_CALL = "external_api_call"
-    SIM_API_CALL = "sim_api_call"
-    COVALENT_API_CALL = "covalent_api_call"
-    MORALIS_API_CALL = "moralis_api_call"
-    GEMINI_API_CALL = "gemini_api_call"
+    API_CALL = SPAN_NAME_API_CALL
+    SIM_API_CALL = SPAN_NAME_SIM_API_CALL
+    COVALENT_API_CALL = SPAN_NAME_COVALENT_API_CALL
+    MORALIS_API_CALL = SPAN_NAME_MORALIS_API_CALL
+    GEMINI_API_CALL = SPAN_NAME_GEMINI_API_CALL
     
     # Database operations
-    NEO4J_QUERY = "neo4j_query"
-    NEO4J_INGEST = "neo4j_ingest"
-    POSTGRES_QUERY = "postgres_query"
-    REDIS_OPERATION = "redis_operation"
+    NEO4J_QUERY = SPAN_NAME_NEO4J_QUERY
+    NEO4J_INGEST = SPAN_NAME_NEO4J_INGEST
+    POSTGRES_QUERY = SPAN_NAME_POSTGRES_QUERY
+    REDIS_OPERATION = SPAN_NAME_REDIS_OPERATION
     
     # Agent workflows
-    CREW_EXECUTION = "crew_execution"
-    AGENT_TASK = "agent_task"
-    TOOL_EXECUTION = "tool_execution"
+    CREW_EXECUTION = SPAN_NAME_CREW_EXECUTION
+    AGENT_TASK = SPAN_NAME_AGENT_TASK
+    TOOL_EXECUTION = SPAN_NAME_TOOL_EXECUTION
     
     # Business logic
-    FRAUD_DETECTION = "fraud_detection"
-    GRAPH_ANALYSIS = "graph_analysis"
-    RAG_QUERY = "rag_query"
-    EVIDENCE_PROCESSING = "evidence_processing"
+    FRAUD_DETECTION = SPAN_NAME_FRAUD_DETECTION
+    GRAPH_ANALYSIS = SPAN_NAME_GRAPH_ANALYSIS
+    RAG_QUERY = SPAN_NAME_RAG_QUERY
+    EVIDENCE_PROCESSING = SPAN_NAME_EVIDENCE_PROCESSING
 
 class SpanAttributes:
-    """Standard span attributes for consistent metadata."""
+    """Standard span attributes for consistent metadata (aliases of ATTR_*)."""
     
     # Service attributes
-    SERVICE_NAME = "service.name"
-    SERVICE_VERSION = "service.version"
-    SERVICE_NAMESPACE = "service.namespace"
+    SERVICE_NAME = ATTR_SERVICE_NAME
+    SERVICE_VERSION = ATTR_SERVICE_VERSION
+    SERVICE_NAMESPACE = ATTR_SERVICE_NAMESPACE
     
     # External API attributes
-    API_PROVIDER = "api.provider"
-    API_ENDPOINT = "api.endpoint"
-    API_METHOD = "api.method"
-    API_STATUS_CODE = "api.status_code"
-    API_COST_USD = "api.cost_usd"
-    API_RATE_LIMITED = "api.rate_limited"
+    API_PROVIDER = ATTR_API_PROVIDER
+    API_ENDPOINT = ATTR_API_ENDPOINT
+    API_METHOD = ATTR_API_METHOD
+    API_STATUS_CODE = ATTR_API_STATUS_CODE
+    API_COST_USD = ATTR_API_COST_USD
+    API_RATE_LIMITED = ATTR_API_RATE_LIMITED
     
     # Database attributes
-    DB_SYSTEM = "db.system"
-    DB_NAME = "db.name"
-    DB_OPERATION = "db.operation"
-    DB_QUERY = "db.statement"
-    DB_ROWS_AFFECTED = "db.rows_affected"
+    DB_SYSTEM = ATTR_DB_SYSTEM
+    DB_NAME = ATTR_DB_NAME
+    DB_OPERATION = ATTR_DB_OPERATION
+    DB_QUERY = ATTR_DB_QUERY
+    DB_ROWS_AFFECTED = ATTR_DB_ROWS_AFFECTED
     
     # Agent attributes
-    CREW_NAME = "crew.name"
-    AGENT_NAME = "agent.name"
-    TASK_TYPE = "task.type"
-    TOOL_NAME = "tool.name"
+    CREW_NAME = ATTR_CREW_NAME
+    AGENT_NAME = ATTR_AGENT_NAME
+    TASK_TYPE = ATTR_TASK_TYPE
+    TOOL_NAME = ATTR_TOOL_NAME
     
     # Business logic attributes
-    WALLET_ADDRESS = "blockchain.wallet_address"
-    CHAIN_ID = "blockchain.chain_id"
-    TOKEN_ADDRESS = "blockchain.token_address"
-    FRAUD_SCORE = "fraud.score"
-    FRAUD_TYPE = "fraud.type"
+    WALLET_ADDRESS = ATTR_WALLET_ADDRESS
+    CHAIN_ID = ATTR_CHAIN_ID
+    TOKEN_ADDRESS = ATTR_TOKEN_ADDRESS
+    FRAUD_SCORE = ATTR_FRAUD_SCORE
+    FRAUD_TYPE = ATTR_FRAUD_TYPE
+    
+    # Sampling attributes
+    SAMPLING_FORCE = ATTR_SAMPLING_FORCE
 
 def init_telemetry(
     otlp_endpoint: Optional[str] = None,
     console_export: bool = False,
-    excluded_urls: Optional[str] = None
+    excluded_urls: Optional[str] = None,
+    sample_rate: Optional[float] = None,
+    bsp_config: Optional[Dict[str, int]] = None,
+    preserve_errors: Optional[bool] = None
 ) -> None:
     """
     Initialize OpenTelemetry tracing for the application.
@@ -132,75 +307,393 @@ def init_telemetry(
         otlp_endpoint: OTLP exporter endpoint (defaults to env var or console)
         console_export: Whether to export to console for debugging
         excluded_urls: Comma-separated URLs to exclude from tracing
+        sample_rate: Head-sampling ratio 0.0-1.0 (defaults to OTEL_TRACE_SAMPLE_RATE)
+        bsp_config: BatchSpanProcessor overrides (see DEFAULT_BSP_CONFIG)
+        preserve_errors: Export error traces the head sampler dropped
+            (defaults to OTEL_TRACE_PRESERVE_ERRORS)
+    
+    Raises:
+        ValueError: If the sample rate is not a number between 0.0 and 1.0
     """
-    global tracer
+    global tracer, _extra_excluded_urls, _preserve_errors, _initialized
+    
+    # Instrumenting twice would duplicate spans and log records
+    if _initialized:
+        logger.debug("OpenTelemetry already initialized; skipping")
+        return
+    
+    if preserve_errors is None:
+        preserve_errors = os.getenv("OTEL_TRACE_PRESERVE_ERRORS", "false").lower() == "true"
+    effective_otlp_endpoint = otlp_endpoint or os.getenv("OTLP_EXPORTER_ENDPOINT")
+    if preserve_errors and not effective_otlp_endpoint:
+        # Preserved spans are only ever exported over OTLP; recording every
+        # span with nothing to consume them would be pure overhead
+        logger.warning("Error trace preservation requires an OTLP endpoint; disabling it")
+        preserve_errors = False
+    _preserve_errors = preserve_errors
     
     # Create resource with service information
     resource = Resource.create({
-        SpanAttributes.SERVICE_NAME: SERVICE_NAME,
-        SpanAttributes.SERVICE_VERSION: SERVICE_VERSION,
-        SpanAttributes.SERVICE_NAMESPACE: SERVICE_NAMESPACE,
+        ATTR_SERVICE_NAME: SERVICE_NAME,
+        ATTR_SERVICE_VERSION: SERVICE_VERSION,
+        ATTR_SERVICE_NAMESPACE: SERVICE_NAMESPACE,
         "deployment.environment": os.getenv("ENVIRONMENT", "development"),
     })
     
-    # Set up tracer provider
-    trace.set_tracer_provider(TracerProvider(resource=resource))
+    # Set up tracer provider; unsampled spans are dropped at creation time
+    trace.set_tracer_provider(
+        TracerProvider(
+            resource=resource,
+            sampler=_build_sampler(sample_rate, preserve_errors)
+        )
+    )
     tracer = trace.get_tracer(__name__, SERVICE_VERSION)
     
     # Configure span processors and exporters
-    _setup_exporters(otlp_endpoint, console_export)
+    _setup_exporters(effective_otlp_endpoint, console_export, bsp_config, preserve_errors)
     
     # Set up auto-instrumentation
+    _extra_excluded_urls = excluded_urls
     _setup_auto_instrumentation(excluded_urls)
     
     # Configure propagators for distributed tracing
+    from opentelemetry.propagate import set_global_textmap
+    from opentelemetry.propagators.b3 import B3MultiFormat
+    
     set_global_textmap(B3MultiFormat())
     
+    _initialized = True
     logger.info(f"OpenTelemetry initialized for {SERVICE_NAME} v{SERVICE_VERSION}")
 
-def _setup_exporters(otlp_endpoint: Optional[str], console_export: bool) -> None:
+def _build_sampler(
+    sample_rate: Optional[float] = None,
+    preserve_errors: bool = False
+) -> Sampler:
+    """
+    Build a parent-based head sampler.
+    
+    Child spans follow the upstream (e.g. B3) sampling decision; root spans
+    are sampled by trace ID ratio, or always when the rate is 1.0. With
+    preserve_errors, dropped spans are still recorded so that
+    ErrorPreservingSpanProcessor can export traces that end up failing.
+    """
+    raw_rate: Union[str, float, None] = sample_rate
+    if raw_rate is None:
+        raw_rate = os.getenv("OTEL_TRACE_SAMPLE_RATE", str(DEFAULT_SAMPLE_RATE))
+    
+    try:
+        rate = float(raw_rate)
+    except (TypeError, ValueError) as e:
+        raise ValueError(f"Invalid trace sample rate: {raw_rate!r}") from e
+    
+    if not 0.0 <= rate <= 1.0:
+        raise ValueError(f"Trace sample rate must be between 0.0 and 1.0, got {rate}")
+    
+    if rate == 1.0:
+        return ParentBased(ALWAYS_ON)
+    if preserve_errors:
+        return ErrorPreservingSampler(rate)
+    return ParentBased(TraceIdRatioBased(rate))
+
+class ErrorPreservingSampler(Sampler):
+    """
+    Head sampler that records, without sampling, the spans it would drop.
+    
+    Recorded-but-unsampled spans are ignored by the regular span processors;
+    ErrorPreservingSpanProcessor buffers them and exports a trace only if one
+    of its spans fails. This approximates tail-based sampling on error status
+    at the cost of recording every span.
+    """
+    
+    def __init__(self, rate: float):
+        self._delegate = ParentBased(TraceIdRatioBased(rate))
+    
+    def should_sample(
+        self,
+        parent_context: Optional[Context],
+        trace_id: int,
+        name: str,
+        kind: Optional[SpanKind] = None,
+        attributes: Attributes = None,
+        links: Optional[Sequence[Link]] = None,
+        trace_state: Optional[TraceState] = None,
+    ) -> SamplingResult:
+        result = self._delegate.should_sample(
+            parent_context, trace_id, name, kind, attributes, links, trace_state
+        )
+        if result.decision is Decision.DROP:
+            # A DROP result carries no attributes; keep the span's own
+            return SamplingResult(Decision.RECORD_ONLY, attributes, result.trace_state)
+        return result
+    
+    def get_description(self) -> str:
+        return f"ErrorPreservingSampler{{{self._delegate.get_description()}}}"
+
+class ErrorPreservingSpanProcessor(SpanProcessor):
+    """
+    Export unsampled traces that contain an error.
+    
+    Unsampled spans are kept in a bounded per-trace buffer. When a span ends
+    with ERROR status or the sampling.force attribute, the buffered spans of
+    its trace are queued for export, as is every later span of that trace.
+    Exports run on a dedicated worker thread with this processor's own
+    exporter, so ending a span never blocks on the collector; batches are
+    dropped when the queue is full.
+    """
+    
+    def __init__(
+        self,
+        exporter: "SpanExporter",
+        max_traces: int = 1024,
+        max_spans_per_trace: int = 128,
+        max_queue_size: int = 256
+    ):
+        self._exporter = exporter
+        self._max_traces = max_traces
+        self._max_spans_per_trace = max_spans_per_trace
+        self._buffers: "OrderedDict[int, List[ReadableSpan]]" = OrderedDict()
+        self._forced: "OrderedDict[int, None]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._queue: "queue.Queue[Optional[List[ReadableSpan]]]" = queue.Queue(max_queue_size)
+        self._worker = threading.Thread(
+            target=self._export_loop, name="ErrorPreservingSpanProcessor", daemon=True
+        )
+        self._worker.start()
+    
+    def on_end(self, span: ReadableSpan) -> None:
+        if span.context is None or span.context.trace_flags.sampled:
+            return
+        
+        trace_id = span.context.trace_id
+        to_export: Optional[List[ReadableSpan]] = None
+        with self._lock:
+            if trace_id in self._forced:
+                to_export = [span]
+            elif _is_error_span(span):
+                to_export = self._buffers.pop(trace_id, [])
+                to_export.append(span)
+                self._forced[trace_id] = None
+                if len(self._forced) > self._max_traces:
+                    self._forced.popitem(last=False)
+            else:
+                buffer = self._buffers.get(trace_id)
+                if buffer is None:
+                    buffer = self._buffers[trace_id] = []
+                    if len(self._buffers) > self._max_traces:
+                        self._buffers.popitem(last=False)
+                if len(buffer) < self._max_spans_per_trace:
+                    buffer.append(span)
+        
+        if to_export:
+            try:
+                self._queue.put_nowait(to_export)
+            except queue.Full:
+                logger.warning("Error trace export queue is full; dropping preserved spans")
+    
+    def _export_loop(self) -> None:
+        """Export queued error traces until shutdown."""
+        while True:
+            spans = self._queue.get()
+            try:
+                if spans is None:
+                    return
+                self._exporter.export(spans)
+            except Exception as e:
+                logger.warning(f"Failed to export preserved error trace: {e}")
+            finally:
+                self._queue.task_done()
+    
+    def force_flush(self, timeout_millis: int = 30000) -> bool:
+        deadline = time.monotonic() + timeout_millis / 1000
+        while self._queue.unfinished_tasks:
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(0.01)
+        return True
+    
+    def shutdown(self) -> None:
+        self.force_flush()
+        self._queue.put(None)
+        self._worker.join()
+        self._exporter.shutdown()
+        with self._lock:
+            self._buffers.clear()
+            self._forced.clear()
+
+def _is_error_span(span: ReadableSpan) -> bool:
+    """Check whether a finished span failed or was flagged for export."""
+    if span.status.status_code is trace.StatusCode.ERROR:
+        return True
+    return bool(span.attributes and span.attributes.get(ATTR_SAMPLING_FORCE))
+
+def _get_bsp_settings(bsp_config: Optional[Dict[str, int]] = None) -> Dict[str, int]:
+    """Resolve BatchSpanProcessor settings from defaults, env vars and overrides."""
+    settings = {
+        key: int(os.getenv(_BSP_ENV_VARS[key], default))
+        for key, default in DEFAULT_BSP_CONFIG.items()
+    }
+    if bsp_config:
+        unknown = set(bsp_config) - set(settings)
+        if unknown:
+            raise ValueError(f"Unknown BatchSpanProcessor settings: {sorted(unknown)}")
+        settings.update({key: int(value) for key, value in bsp_config.items()})
+    return settings
+
+def _build_batch_processor(
+    exporter: "SpanExporter",
+    bsp_settings: Dict[str, int]
+) -> "BatchSpanProcessor":
+    """Create a BatchSpanProcessor from resolved settings (see _get_bsp_settings)."""
+    from opentelemetry.sdk.trace.export import BatchSpanProcessor
+    
+    return BatchSpanProcessor(
+        exporter,
+        max_queue_size=bsp_settings["max_queue_size"],
+        schedule_delay_millis=bsp_settings["schedule_delay_millis"],
+        max_export_batch_size=bsp_settings["max_export_batch_size"],
+        export_timeout_millis=bsp_settings["export_timeout_millis"],
+    )
+
+def _get_otlp_compression() -> "Compression":
+    """Resolve OTLP exporter compression from OTEL_EXPORTER_OTLP_COMPRESSION (default gzip)."""
+    from grpc import Compression
+    
+    value = os.getenv("OTEL_EXPORTER_OTLP_COMPRESSION", "gzip").lower().strip()
+    if value not in _OTLP_COMPRESSION:
+        raise ValueError(f"Unsupported OTLP compression: {value!r}")
+    return getattr(Compression, _OTLP_COMPRESSION[value])
+
+class RoundRobinSpanProcessor(SpanProcessor):
+    """
+    Distribute finished spans across several span processors.
+    
+    Each wrapped BatchSpanProcessor has its own export thread and exporter,
+    so bursts are exported concurrently instead of through a single worker.
+    Every span goes to exactly one processor.
+    """
+    
+    def __init__(self, processors: Sequence[SpanProcessor]):
+        if not processors:
+            raise ValueError("RoundRobinSpanProcessor requires at least one processor")
+        self._processors = tuple(processors)
+        self._next_processor = cycle(self._processors)
+    
+    def on_end(self, span: ReadableSpan) -> None:
+        next(self._next_processor).on_end(span)
+    
+    def shutdown(self) -> None:
+        for processor in self._processors:
+            processor.shutdown()
+    
+    def force_flush(self, timeout_millis: int = 30000) -> bool:
+        # Flush every processor even if an earlier one times out
+        results = [processor.force_flush(timeout_millis) for processor in self._processors]
+        return all(results)
+
+def _get_concurrent_exports() -> int:
+    """Resolve the number of parallel OTLP export pipelines."""
+    value = int(os.getenv("OTEL_BSP_MAX_CONCURRENT_EXPORTS", DEFAULT_CONCURRENT_EXPORTS))
+    if value < 1:
+        raise ValueError(f"OTEL_BSP_MAX_CONCURRENT_EXPORTS must be >= 1, got {value}")
+    return value
+
+def _build_otlp_exporter(endpoint: str) -> "OTLPSpanExporter":
+    """Create an OTLP gRPC span exporter (each instance opens its own channel)."""
+    from opentelemetry.exporter.otlp.proto.grpc.trace_exporter import OTLPSpanExporter
+    
+    return OTLPSpanExporter(
+        endpoint=endpoint,
+        headers={"Authorization": f"Bearer {os.getenv('OTLP_AUTH_TOKEN', '')}"},
+        compression=_get_otlp_compression()
+    )
+
+def _setup_exporters(
+    otlp_endpoint: Optional[str],
+    console_export: bool,
+    bsp_config: Optional[Dict[str, int]] = None,
+    preserve_errors: bool = False
+) -> None:
     """Set up span exporters."""
+    from opentelemetry.sdk.trace.export import ConsoleSpanExporter
+    
     tracer_provider = trace.get_tracer_provider()
+    bsp_settings = _get_bsp_settings(bsp_config)
     
     # OTLP exporter (for Jaeger, Grafana, etc.)
     effective_otlp_endpoint = otlp_endpoint or os.getenv("OTLP_EXPORTER_ENDPOINT")
     if effective_otlp_endpoint:
-        otlp_exporter = OTLPSpanExporter(
-            endpoint=effective_otlp_endpoint,
-            headers={"Authorization": f"Bearer {os.getenv('OTLP_AUTH_TOKEN', '')}"}
+        otlp_exporters = [
+            _build_otlp_exporter(effective_otlp_endpoint)
+            for _ in range(_get_concurrent_exports())
+        ]
+        batch_processors = [
+            _build_batch_processor(exporter, bsp_settings) for exporter in otlp_exporters
+        ]
+        if len(batch_processors) == 1:
+            tracer_provider.add_span_processor(batch_processors[0])
+        else:
+            tracer_provider.add_span_processor(RoundRobinSpanProcessor(batch_processors))
+        if preserve_errors:
+            tracer_provider.add_span_processor(
+                ErrorPreservingSpanProcessor(_build_otlp_exporter(effective_otlp_endpoint))
+            )
+        logger.info(
+            f"OTLP exporter configured for endpoint: {effective_otlp_endpoint} "
+            f"({len(otlp_exporters)} concurrent exports)"
         )
-        tracer_provider.add_span_processor(BatchSpanProcessor(otlp_exporter))
-        logger.info(f"OTLP exporter configured for endpoint: {effective_otlp_endpoint}")
     
     # Console exporter (for development/debugging)
     if console_export or os.getenv("OTEL_TRACE_CONSOLE", "false").lower() == "true":
         console_exporter = ConsoleSpanExporter()
-        tracer_provider.add_span_processor(BatchSpanProcessor(console_exporter))
+        tracer_provider.add_span_processor(_build_batch_processor(console_exporter, bsp_settings))
         logger.info("Console trace exporter enabled")
 
+def get_excluded_urls_list(excluded_urls_str: Optional[str] = None) -> List[str]:
+    """
+    Get URL patterns excluded from HTTP instrumentation.
+    
+    Uses OTEL_PYTHON_EXCLUDED_URLS (or DEFAULT_EXCLUDED_URLS when unset) plus
+    any extra comma-separated patterns, e.g. for
+    ``FastAPIInstrumentor.instrument_app(app, excluded_urls=",".join(...))``.
+    """
+    configured = os.getenv("OTEL_PYTHON_EXCLUDED_URLS", DEFAULT_EXCLUDED_URLS)
+    if excluded_urls_str:
+        configured = f"{configured},{excluded_urls_str}"
+    return [url.strip() for url in configured.split(",") if url.strip()]
+
 def _setup_auto_instrumentation(excluded_urls_str: Optional[str]) -> None:
     """Set up automatic instrumentation for common libraries."""
     
     # Determine excluded URLs
-    excluded_urls = get_excluded_urls("OTEL_PYTHON_EXCLUDED_URLS")
-    if excluded_urls_str:
-        excluded_urls.extend(excluded_urls_str.split(","))
+    excluded_urls = ",".join(get_excluded_urls_list(excluded_urls_str))
     
-    # FastAPI instrumentation is handled explicitly in `backend.main`
+    # FastAPI instrumentation is applied by `backend.main` via instrument_fastapi()
     
     # HTTP client instrumentation
     try:
+        from opentelemetry.instrumentation.httpx import HTTPXClientInstrumentor
+        from opentelemetry.instrumentation.requests import RequestsInstrumentor
+        
+        # The HTTPX instrumentor has no excluded_urls argument; it only reads
+        # its env var when instrumenting, so respect an explicit value
+        os.environ.setdefault("OTEL_PYTHON_HTTPX_EXCLUDED_URLS", excluded_urls)
         HTTPXClientInstrumentor().instrument(
             request_hook=_httpx_request_hook,
             response_hook=_httpx_response_hook
         )
-        RequestsInstrumentor().instrument()
+        RequestsInstrumentor().instrument(
+            excluded_urls=excluded_urls,
+            request_hook=_requests_request_hook
+        )
         logger.info("HTTP client auto-instrumentation enabled")
     except Exception as e:
         logger.warning(f"HTTP client instrumentation failed: {e}")
     
     # Database instrumentation
     try:
+        from opentelemetry.instrumentation.psycopg2 import Psycopg2Instrumentor
+        from opentelemetry.instrumentation.redis import RedisInstrumentor
+        
         Psycopg2Instrumentor().instrument()
         RedisInstrumentor().instrument()
         logger.info("Database auto-instrumentation enabled")
@@ -209,64 +702,113 @@ def _setup_auto_instrumentation(excluded_urls_str: Optional[str]) -> None:
     
     # Logging instrumentation
     try:
-        LoggingInstrumentor().instrument()
+        from opentelemetry.instrumentation.logging import LoggingInstrumentor
+        
+        LoggingInstrumentor().instrument(tracer_provider=trace.get_tracer_provider())
         logger.info("Logging auto-instrumentation enabled")
     except Exception as e:
         logger.warning(f"Logging instrumentation failed: {e}")
 
+def instrument_fastapi(app: Any, excluded_urls: Optional[str] = None) -> None:
+    """
+    Instrument a FastAPI app with the module's hooks and URL exclusions.
+    
+    Args:
+        app: FastAPI application (must be called before the app starts)
+        excluded_urls: Extra comma-separated URL patterns to exclude
+            (defaults to those passed to init_telemetry)
+    """
+    try:
+        from opentelemetry.instrumentation.fastapi import FastAPIInstrumentor
+        
+        if excluded_urls is None:
+            excluded_urls = _extra_excluded_urls
+        FastAPIInstrumentor.instrument_app(
+            app,
+            server_request_hook=_fastapi_request_hook,
+            client_response_hook=_fastapi_response_hook,
+            excluded_urls=",".join(get_excluded_urls_list(excluded_urls)),
+        )
+        logger.info("FastAPI auto-instrumentation enabled")
+    except Exception as e:
+        logger.warning(f"FastAPI instrumentation failed: {e}")
+
 def _fastapi_request_hook(span: trace.Span, scope: Dict[str, Any]) -> None:
     """Hook for FastAPI request instrumentation."""
     if span and span.is_recording():
-        # Add custom request attributes
-        span.set_attribute("http.route", scope.get("route", {}).get("path", "unknown"))
+        # Add custom request attributes; the route is only in the scope once
+        # routing has run, so never overwrite the instrumentor's http.route
+        route_path = getattr(scope.get("route"), "path", None)
+        if route_path:
+            span.set_attribute("http.route", route_path)
         span.set_attribute("fastapi.version", "0.104.1")
 
-def _fastapi_response_hook(span: trace.Span, message: Dict[str, Any]) -> None:
+def _fastapi_response_hook(
+    span: trace.Span,
+    scope: Dict[str, Any],
+    message: Dict[str, Any]
+) -> None:
     """Hook for FastAPI response instrumentation."""
     if span and span.is_recording():
         # Add response metadata
         if "status" in message:
             span.set_attribute("http.status_code", message["status"])
 
-def _httpx_request_hook(span: trace.Span, request) -> None:
+def _httpx_request_hook(span: trace.Span, request: Any) -> None:
     """Hook for HTTP client request instrumentation."""
     if span and span.is_recording():
-        # Detect provider from URL
-        url = str(request.url)
-        provider = _detect_api_provider(url)
+        # Detect provider from the already-parsed httpx URL host
+        provider = _detect_api_provider_by_host(request.url.host)
+        _sanitize_span_url(span, str(request.url))
         if provider:
-            span.set_attribute(SpanAttributes.API_PROVIDER, provider)
+            span.set_attribute(ATTR_API_PROVIDER, provider)
             span.update_name(f"{provider}_api_call")
 
-def _httpx_response_hook(span: trace.Span, response) -> None:
+def _httpx_response_hook(span: trace.Span, request: Any, response: Any) -> None:
     """Hook for HTTP client response instrumentation."""
     if span and span.is_recording():
-        span.set_attribute(SpanAttributes.API_STATUS_CODE, response.status_code)
+        span.set_attribute(ATTR_API_STATUS_CODE, response.status_code)
         
         # Add rate limiting information
         if response.status_code == 429:
-            span.set_attribute(SpanAttributes.API_RATE_LIMITED, True)
+            span.set_attribute(ATTR_API_RATE_LIMITED, True)
             retry_after = response.headers.get("Retry-After")
             if retry_after:
                 span.set_attribute("api.retry_after", retry_after)
 
-def _detect_api_provider(url: str) -> Optional[str]:
-    """Detect API provider from URL."""
-    if "api.sim.dune.com" in url:
-        return "sim"
-    elif "api.covalenthq.com" in url:
-        return "covalent"
-    elif "deep-index.moralis.io" in url:
-        return "moralis"
-    elif "generativelanguage.googleapis.com" in url:
-        return "gemini"
-    return None
+def _requests_request_hook(span: trace.Span, request: "PreparedRequest") -> None:
+    """Hook for requests instrumentation."""
+    if span and span.is_recording() and request.url:
+        _sanitize_span_url(span, request.url)
+
+def _sanitize_span_url(span: trace.Span, url: str) -> None:
+    """
+    Replace the full URL set by HTTP instrumentation with its normalized form,
+    so query strings (API keys, wallet filters) are never exported.
+    """
+    attributes = getattr(span, "attributes", None) or {}
+    normalized_url = _normalize_url(url)
+    for key in _HTTP_URL_ATTRIBUTES:
+        if key in attributes:
+            span.set_attribute(key, normalized_url)
+
+def _normalize_url(url: str) -> str:
+    """Strip query/fragment and replace overly long tokens to cap cardinality."""
+    return _LONG_TOKEN_RE.sub("{token}", _SANITIZE_QUERY_RE.sub("", url))
+
+def _detect_api_provider_by_host(host: Optional[str]) -> Optional[str]:
+    """Detect API provider from an exact (lowercase) hostname."""
+    if not host:
+        return None
+    return _PROVIDER_HOSTS.get(host)
 
 # Decorators for manual instrumentation
 
 def trace_function(
     span_name: Optional[str] = None,
-    attributes: Optional[Dict[str, Any]] = None
+    attributes: Optional[Dict[str, Any]] = None,
+    events: Optional[Dict[str, Dict[str, Any]]] = None,
+    event_factory: Optional[Callable[[], Optional[Dict[str, Dict[str, Any]]]]] = None
 ) -> Callable:
     """
     Decorator to trace function execution.
@@ -274,46 +816,83 @@ def trace_function(
     Args:
         span_name: Custom span name (defaults to function name)
         attributes: Additional span attributes
+        events: Span events keyed by name, for high-cardinality values that
+            should not become indexed attributes
+        event_factory: Called per recorded span to produce per-call events
+            (e.g. from context variables)
     """
     def decorator(func: Callable) -> Callable:
-        @wraps(func)
-        async def async_wrapper(*args, **kwargs):
-            name = span_name or f"{func.__module__}.{func.__name__}"
-            with tracer.start_as_current_span(name) as span:
-                if attributes:
-                    for key, value in attributes.items():
-                        span.set_attribute(key, value)
-                
-                try:
-                    result = await func(*args, **kwargs)
-                    span.set_status(trace.Status(trace.StatusCode.OK))
-                    return result
-                except Exception as e:
-                    span.set_status(trace.Status(trace.StatusCode.ERROR, str(e)))
-                    span.record_exception(e)
-                    raise
+        # Resolved once at decoration time rather than on every call; the
+        # attributes are validated once and passed at span creation, where the
+        # sampler can also see them
+        name = span_name or f"{func.__module__}.{func.__name__}"
+        span_attributes = (
+            BoundedAttributes(attributes=attributes, immutable=True) if attributes else None
+        )
+        
+        if inspect.iscoroutinefunction(func):
+            @wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with tracer.start_as_current_span(
+                    name,
+                    attributes=span_attributes,
+                    record_exception=False,
+                    set_status_on_exception=False
+                ) as span:
+                    if not span.is_recording():
+                        return await func(*args, **kwargs)
+                    
+                    if events:
+                        for event_name, event_attributes in events.items():
+                            span.add_event(event_name, event_attributes)
+                    if event_factory:
+                        for event_name, event_attributes in (event_factory() or {}).items():
+                            span.add_event(event_name, event_attributes)
+                    
+                    try:
+                        result = await func(*args, **kwargs)
+                        if RECORD_OK_STATUS:
+                            span.set_status(trace.Status(trace.StatusCode.OK))
+                        return result
+                    except Exception as e:
+                        if _preserve_errors:
+                            span.set_attribute(ATTR_SAMPLING_FORCE, True)
+                        span.set_status(trace.Status(trace.StatusCode.ERROR, str(e)))
+                        span.record_exception(e)
+                        raise
+            
+            return async_wrapper
         
         @wraps(func)
         def sync_wrapper(*args, **kwargs):
-            name = span_name or f"{func.__module__}.{func.__name__}"
-            with tracer.start_as_current_span(name) as span:
-                if attributes:
-                    for key, value in attributes.items():
-                        span.set_attribute(key, value)
+            with tracer.start_as_current_span(
+                name,
+                attributes=span_attributes,
+                record_exception=False,
+                set_status_on_exception=False
+            ) as span:
+                if not span.is_recording():
+                    return func(*args, **kwargs)
+                
+                if events:
+                    for event_name, event_attributes in events.items():
+                        span.add_event(event_name, event_attributes)
+                if event_factory:
+                    for event_name, event_attributes in (event_factory() or {}).items():
+                        span.add_event(event_name, event_attributes)
                 
                 try:
                     result = func(*args, **kwargs)
-                    span.set_status(trace.Status(trace.StatusCode.OK))
+                    if RECORD_OK_STATUS:
+                        span.set_status(trace.Status(trace.StatusCode.OK))
                     return result
                 except Exception as e:
+                    if _preserve_errors:
+                        span.set_attribute(ATTR_SAMPLING_FORCE, True)
                     span.set_status(trace.Status(trace.StatusCode.ERROR, str(e)))
                     span.record_exception(e)
                     raise
         
-        # Check if the function is async
-        import asyncio
-        if asyncio.iscoroutinefunction(func):
-            return async_wrapper
         return sync_wrapper
     return decorator
 
@@ -331,14 +910,21 @@ def trace_span(
         attributes: Span attributes
         kind: Span kind (INTERNAL, CLIENT, SERVER, PRODUCER, CONSUMER)
     """
-    with tracer.start_as_current_span(name, kind=kind) as span:
+    # Exceptions are recorded below, so the SDK's own handling is disabled
+    with tracer.start_as_current_span(
+        name, kind=kind, record_exception=False, set_status_on_exception=False
+    ) as span:
+        if not span.is_recording():
+            yield span
+            return
+        
         if attributes:
-            for key, value in attributes.items():
-                span.set_attribute(key, value)
+            span.set_attributes(attributes)
         
         try:
             yield span
-            span.set_status(trace.Status(trace.StatusCode.OK))
+            if RECORD_OK_STATUS:
+                span.set_status(trace.Status(trace.StatusCode.OK))
         except Exception as e:
             span.set_status(trace.Status(trace.StatusCode.ERROR, str(e)))
             span.record_exception(e)
@@ -356,6 +942,14 @@ def add_span_attribute(key: str, value: Any) -> None:
     if span and span.is_recording():
         span.set_attribute(key, value)
 
+def add_span_attributes(attributes: Dict[str, Any]) -> None:
+    """Add several attributes to current span with a single span lookup."""
+    if not attributes:
+        return
+    span = get_current_span()
+    if span and span.is_recording():
+        span.set_attributes(attributes)
+
 def add_span_event(name: str, attributes: Optional[Dict[str, Any]] = None) -> None:
     """Add event to current span if active."""
     span = get_current_span()
@@ -380,9 +974,9 @@ def trace_api_call(
     return trace_function(
         span_name=f"{provider}_api_call",
         attributes={
-            SpanAttributes.API_PROVIDER: provider,
-            SpanAttributes.API_ENDPOINT: endpoint,
-            SpanAttributes.API_METHOD: method
+            ATTR_API_PROVIDER: provider,
+            ATTR_API_ENDPOINT: endpoint,
+            ATTR_API_METHOD: method
         }
     )
 
@@ -393,11 +987,11 @@ def trace_db_operation(
 ) -> Callable:
     """Decorator for tracing database operations."""
     attributes = {
-        SpanAttributes.DB_SYSTEM: system,
-        SpanAttributes.DB_OPERATION: operation
+        ATTR_DB_SYSTEM: system,
+        ATTR_DB_OPERATION: operation
     }
     if db_name:
-        attributes[SpanAttributes.DB_NAME] = db_name
+        attributes[ATTR_DB_NAME] = db_name
     
     return trace_function(
         span_name=f"{system}_{operation}",
@@ -411,33 +1005,71 @@ def trace_agent_task(
 ) -> Callable:
     """Decorator for tracing agent task execution."""
     return trace_function(
-        span_name=SpanNames.AGENT_TASK,
+        span_name=SPAN_NAME_AGENT_TASK,
         attributes={
-            SpanAttributes.CREW_NAME: crew_name,
-            SpanAttributes.AGENT_NAME: agent_name,
-            SpanAttributes.TASK_TYPE: task_type
+            ATTR_CREW_NAME: crew_name,
+            ATTR_AGENT_NAME: agent_name,
+            ATTR_TASK_TYPE: task_type
         }
     )
 
+@contextmanager
+def wallet_context(wallet_address: Optional[str]) -> Iterator[None]:
+    """
+    Set the wallet recorded by trace_fraud_detection spans in this context.
+    
+    Usage:
+        with wallet_context(address):
+            result = await detect_wash_trading(address)
+    """
+    token = _WALLET_CTX.set(wallet_address)
+    try:
+        yield
+    finally:
+        _WALLET_CTX.reset(token)
+
+def _wallet_event() -> Optional[Dict[str, Dict[str, Any]]]:
+    """Build the wallet span event from the current wallet context."""
+    wallet_address = _WALLET_CTX.get()
+    if not wallet_address:
+        return None
+    return {"wallet": {ATTR_WALLET_ADDRESS: wallet_address}}
+
+@lru_cache(maxsize=None)
+def _fraud_detection_decorator(detection_type: str) -> Callable:
+    """Build (once per detection type) the trace_fraud_detection decorator."""
+    return trace_function(
+        span_name=SPAN_NAME_FRAUD_DETECTION,
+        attributes={ATTR_FRAUD_TYPE: detection_type},
+        event_factory=_wallet_event
+    )
+
 def trace_fraud_detection(
     detection_type: str,
     wallet_address: Optional[str] = None
 ) -> Callable:
-    """Decorator for tracing fraud detection operations."""
-    attributes = {SpanAttributes.FRAUD_TYPE: detection_type}
-    if wallet_address:
-        attributes[SpanAttributes.WALLET_ADDRESS] = wallet_address
+    """
+    Decorator for tracing fraud detection operations.
     
+    The wallet is read per call from wallet_context(), so the decorator is
+    built once per detection type. Passing wallet_address fixes the wallet at
+    decoration time instead and builds a new decorator on every call.
+    """
+    if not wallet_address:
+        return _fraud_detection_decorator(detection_type)
+    
+    # Wallet addresses are high-cardinality, so record them as an event
+    # rather than an indexed span attribute
     return trace_function(
-        span_name=SpanNames.FRAUD_DETECTION,
-        attributes=attributes
+        span_name=SPAN_NAME_FRAUD_DETECTION,
+        attributes={ATTR_FRAUD_TYPE: detection_type},
+        events={"wallet": {ATTR_WALLET_ADDRESS: wallet_address}}
     )
 
 # Module initialization
-if not tracer:
-    # Auto-initialize if environment variables are set
-    if os.getenv("OTEL_TRACE_ENABLED", "false").lower() == "true":
-        init_telemetry(
-            otlp_endpoint=os.getenv("OTLP_EXPORTER_ENDPOINT"),
-            console_export=os.getenv("OTEL_TRACE_CONSOLE", "false").lower() == "true"
-        )
+# Auto-initialize if environment variables are set
+if TRACING_ENABLED:
+    init_telemetry(
+        otlp_endpoint=os.getenv("OTLP_EXPORTER_ENDPOINT"),
+        console_export=os.getenv("OTEL_TRACE_CONSOLE", "false").lower() == "true"
+    )
@@ -37,7 +37,7 @@ from backend.api.v1 import (
 from backend.auth.dependencies import get_current_user
 from backend.core import events, logging as app_logging, metrics, sentry_config
 # OpenTelemetry tracing
-from backend.core.telemetry import init_telemetry
+from backend.core.telemetry import TRACING_ENABLED, instrument_fastapi
 from backend.database import create_db_and_tables, get_engine
 from backend.jobs import sim_graph_job
 from backend.jobs.worker_monitor import WorkerMonitor  # start Celery worker monitor
@@ -65,17 +65,6 @@ app = FastAPI(
     redoc_url="/api/redoc" if FASTAPI_DEBUG else None,
 )
 
-# Initialize OpenTelemetry telemetry
-@app.on_event("startup")
-async def initialize_telemetry() -> None:
-    """Configure OpenTelemetry tracing on startup (if OTEL_TRACE_ENABLED=true)."""
-    # Environment-driven configuration (see backend/core/telemetry.py)
-    init_telemetry(
-        otlp_endpoint=os.getenv("OTLP_EXPORTER_ENDPOINT"),
-        console_export=os.getenv("OTEL_TRACE_CONSOLE", "false").lower() == "true",
-    )
-    logger.info("OpenTelemetry telemetry setup executed")
-
 # Initialize Sentry for error tracking
 @app.on_event("startup")
 async def initialize_sentry() -> None:
@@ -116,6 +105,11 @@ app.add_middleware(
 # Mount back-pressure middleware (rate-limit, budget & circuit-breaker)
 app.add_middleware(BackpressureMiddleware)
 
+# OpenTelemetry FastAPI instrumentation (health/metrics endpoints excluded);
+# tracing itself is initialized when backend.core.telemetry is imported
+if TRACING_ENABLED:
+    instrument_fastapi(app)
+
 # Include API routers
 api_v1 = FastAPI(openapi_prefix="/api/v1")
 api_v1.include_router(auth.router, prefix="/auth", tags=["Authentication"])
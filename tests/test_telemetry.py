@@ -0,0 +1,284 @@
+"""Unit tests for the OpenTelemetry integration.
+
+This module contains tests for sampler construction, error trace
+preservation, span processor configuration and HTTP client hooks in
+backend.core.telemetry.
+"""
+
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import httpx
+import pytest
+from opentelemetry.sdk.trace import SpanProcessor, TracerProvider
+from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter
+from opentelemetry.sdk.trace.sampling import Decision
+from opentelemetry.trace import Status, StatusCode
+
+from backend.core import telemetry
+from backend.core.telemetry import (
+    _BSP_ENV_VARS,
+    DEFAULT_BSP_CONFIG,
+    MAX_URL_TOKEN_LENGTH,
+    ErrorPreservingSampler,
+    ErrorPreservingSpanProcessor,
+    RoundRobinSpanProcessor,
+    _build_sampler,
+    _detect_api_provider_by_host,
+    _get_bsp_settings,
+    _httpx_request_hook,
+    _httpx_response_hook,
+    _normalize_url,
+    init_telemetry,
+    trace_api_call,
+)
+
+# ---- Fixtures ----
+
+
+@pytest.fixture
+def exporter():
+    """In-memory exporter receiving preserved spans."""
+    return InMemorySpanExporter()
+
+
+def _make_tracer(processor):
+    """Tracer whose provider samples nothing and preserves errors."""
+    provider = TracerProvider(sampler=ErrorPreservingSampler(0.0))
+    provider.add_span_processor(processor)
+    return provider.get_tracer("test"), provider
+
+
+def _exported_names(exporter):
+    return sorted(span.name for span in exporter.get_finished_spans())
+
+
+# ---- Sampler tests ----
+
+
+def test_error_preserving_sampler_records_dropped_spans():
+    sampler = ErrorPreservingSampler(0.0)
+    result = sampler.should_sample(None, 1, "span")
+    assert result.decision is Decision.RECORD_ONLY
+
+
+def test_error_preserving_sampler_keeps_sampled_spans():
+    sampler = ErrorPreservingSampler(1.0)
+    result = sampler.should_sample(None, 1, "span")
+    assert result.decision is Decision.RECORD_AND_SAMPLE
+
+
+@pytest.mark.parametrize("rate", ["x", 2, -0.1])
+def test_build_sampler_rejects_invalid_rate(rate):
+    with pytest.raises(ValueError):
+        _build_sampler(rate, False)
+
+
+def test_failed_init_can_be_retried(monkeypatch):
+    monkeypatch.setattr(telemetry, "_initialized", False)
+    with pytest.raises(ValueError):
+        init_telemetry(sample_rate=2.0)
+    assert telemetry._initialized is False
+
+
+# ---- Error preservation tests ----
+
+
+def test_unsampled_trace_without_error_is_not_exported(exporter):
+    processor = ErrorPreservingSpanProcessor(exporter)
+    tracer, provider = _make_tracer(processor)
+
+    with tracer.start_as_current_span("parent"):
+        with tracer.start_as_current_span("child"):
+            pass
+
+    provider.force_flush()
+    assert exporter.get_finished_spans() == ()
+    provider.shutdown()
+
+
+def test_error_flushes_buffered_trace_and_later_spans(exporter):
+    processor = ErrorPreservingSpanProcessor(exporter)
+    tracer, provider = _make_tracer(processor)
+
+    with tracer.start_as_current_span("parent"):
+        with tracer.start_as_current_span("ok"):
+            pass
+        with tracer.start_as_current_span("failed") as span:
+            span.set_status(Status(StatusCode.ERROR))
+        with tracer.start_as_current_span("after"):
+            pass
+
+    provider.force_flush()
+    assert _exported_names(exporter) == ["after", "failed", "ok", "parent"]
+    provider.shutdown()
+
+
+def test_preserved_error_span_keeps_decorator_attributes(exporter, monkeypatch):
+    processor = ErrorPreservingSpanProcessor(exporter)
+    tracer, provider = _make_tracer(processor)
+    monkeypatch.setattr(telemetry, "tracer", tracer)
+    monkeypatch.setattr(telemetry, "_preserve_errors", True)
+
+    @trace_api_call("sim", "/balances")
+    def fetch_balances():
+        raise RuntimeError("upstream failure")
+
+    with pytest.raises(RuntimeError):
+        fetch_balances()
+
+    provider.force_flush()
+    (span,) = exporter.get_finished_spans()
+    assert span.attributes["api.provider"] == "sim"
+    assert span.attributes["api.endpoint"] == "/balances"
+    assert span.attributes["api.method"] == "GET"
+    provider.shutdown()
+
+
+def test_buffered_traces_are_bounded(exporter):
+    processor = ErrorPreservingSpanProcessor(exporter, max_traces=2)
+    tracer, provider = _make_tracer(processor)
+
+    for name in ("first", "second", "third"):
+        with tracer.start_as_current_span(name):
+            with tracer.start_as_current_span(f"{name}-child"):
+                pass
+
+    assert len(processor._buffers) == 2
+    provider.shutdown()
+
+
+def test_buffered_spans_per_trace_are_bounded(exporter):
+    processor = ErrorPreservingSpanProcessor(exporter, max_spans_per_trace=3)
+    tracer, provider = _make_tracer(processor)
+
+    with tracer.start_as_current_span("parent") as parent:
+        for i in range(5):
+            with tracer.start_as_current_span(f"child-{i}"):
+                pass
+        parent.set_status(Status(StatusCode.ERROR))
+
+    provider.force_flush()
+    # The error span itself is always exported on top of the capped buffer
+    assert len(exporter.get_finished_spans()) == 4
+    provider.shutdown()
+
+
+# ---- Round-robin export tests ----
+
+
+def test_round_robin_sends_each_span_to_one_processor():
+    processors = [MagicMock(spec=SpanProcessor) for _ in range(3)]
+    provider = TracerProvider()
+    provider.add_span_processor(RoundRobinSpanProcessor(processors))
+    tracer = provider.get_tracer("test")
+
+    for i in range(6):
+        with tracer.start_as_current_span(f"span-{i}"):
+            pass
+
+    ended = [call.args[0].name for p in processors for call in p.on_end.call_args_list]
+    assert sorted(ended) == sorted(f"span-{i}" for i in range(6))
+    assert [p.on_end.call_count for p in processors] == [2, 2, 2]
+
+
+def test_round_robin_fans_out_flush_and_shutdown():
+    processors = [MagicMock(spec=SpanProcessor) for _ in range(3)]
+    processors[0].force_flush.return_value = False
+    processors[1].force_flush.return_value = True
+    processors[2].force_flush.return_value = True
+    round_robin = RoundRobinSpanProcessor(processors)
+
+    assert round_robin.force_flush(100) is False
+    round_robin.shutdown()
+
+    for processor in processors:
+        processor.force_flush.assert_called_once_with(100)
+        processor.shutdown.assert_called_once_with()
+
+
+def test_round_robin_requires_processors():
+    with pytest.raises(ValueError):
+        RoundRobinSpanProcessor([])
+
+
+# ---- BatchSpanProcessor settings tests ----
+
+
+def test_bsp_settings_default_without_env_or_overrides(monkeypatch):
+    for env_var in _BSP_ENV_VARS.values():
+        monkeypatch.delenv(env_var, raising=False)
+    assert _get_bsp_settings() == DEFAULT_BSP_CONFIG
+
+
+def test_bsp_settings_apply_overrides(monkeypatch):
+    monkeypatch.delenv("OTEL_BSP_MAX_EXPORT_BATCH_SIZE", raising=False)
+    settings = _get_bsp_settings({"max_export_batch_size": 64})
+    assert settings["max_export_batch_size"] == 64
+
+
+def test_bsp_settings_read_env_vars(monkeypatch):
+    monkeypatch.setenv("OTEL_BSP_MAX_QUEUE_SIZE", "1024")
+    settings = _get_bsp_settings()
+    assert settings["max_queue_size"] == 1024
+
+
+def test_bsp_settings_overrides_take_precedence_over_env(monkeypatch):
+    monkeypatch.setenv("OTEL_BSP_MAX_QUEUE_SIZE", "1024")
+    settings = _get_bsp_settings({"max_queue_size": 512})
+    assert settings["max_queue_size"] == 512
+
+
+def test_bsp_settings_reject_unknown_keys():
+    with pytest.raises(ValueError):
+        _get_bsp_settings({"max_batch": 256})
+
+
+# ---- HTTP client hook tests ----
+
+
+def test_normalize_url_strips_query_and_fragment():
+    assert _normalize_url("https://api.sim.dune.com/v1/balances?key=secret#x") == (
+        "https://api.sim.dune.com/v1/balances"
+    )
+
+
+def test_normalize_url_replaces_long_tokens():
+    token = "a" * (MAX_URL_TOKEN_LENGTH + 1)
+    assert (
+        _normalize_url(f"https://host/v1/{token}/items")
+        == "https://host/v1/{token}/items"
+    )
+
+
+@pytest.mark.parametrize(
+    "host, provider",
+    [
+        ("api.sim.dune.com", "sim"),
+        ("api.sim.dune.com.attacker.io", None),
+        ("evil-api.sim.dune.com", None),
+        (None, None),
+    ],
+)
+def test_detect_api_provider_by_exact_host(host, provider):
+    assert _detect_api_provider_by_host(host) == provider
+
+
+def test_httpx_hooks_sanitize_url_and_record_status(exporter):
+    provider = TracerProvider()
+    provider.add_span_processor(SimpleSpanProcessor(exporter))
+    tracer = provider.get_tracer("test")
+    url = httpx.URL("https://api.sim.dune.com/v1/balances/0xabc?api_key=secret")
+    request = SimpleNamespace(url=url)
+    response = SimpleNamespace(status_code=429, headers={"Retry-After": "5"})
+
+    with tracer.start_as_current_span("GET", attributes={"http.url": str(url)}) as span:
+        _httpx_request_hook(span, request)
+        _httpx_response_hook(span, request, response)
+
+    (span,) = exporter.get_finished_spans()
+    assert span.name == "sim_api_call"
+    assert span.attributes["http.url"] == "https://api.sim.dune.com/v1/balances/0xabc"
+    assert span.attributes["api.status_code"] == 429
+    assert span.attributes["api.rate_limited"] is True